@@ -1,495 +1,766 @@
-import pandas as pd
-import requests
-from bs4 import BeautifulSoup
-import difflib
-import re
-import os
-from datetime import datetime
-import json
-import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
-from tenacity import retry, stop_after_attempt, wait_exponential
-from tqdm import tqdm
-from html_report import generate_html_report
-
-# --- Конфигурация ---
-INPUT_CSV = r".\Test_check.csv"
-OUTPUT_DIR = "results"
-
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-}
-
-# --- Функции ---
-
-def ensure_directory_exists():
-    if not os.path.exists(OUTPUT_DIR):
-        os.makedirs(OUTPUT_DIR)
-
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-def extract_text_from_url(URL):
-    """Извлекает основной текст статьи по URL"""
-    try:
-        response = requests.get(URL, headers=HEADERS, timeout=20)
-        response.raise_for_status()
-
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # Удаляем ненужные элементы
-        for tag in ['script', 'style', 'nav', 'footer', 'iframe', 'img', 'button']:
-            for element in soup.find_all(tag):
-                element.decompose()
-
-        # Поиск основного контента
-        article_body = (
-            soup.find('article') or
-            soup.find(class_=re.compile(r'(post-body|article-text|entry-content|articleBody)', re.I)) or
-            soup.find(itemprop='articleBody') or
-            soup.find('div', class_='article__text') or
-            soup.find('body')
-        )
-
-        text = article_body.get_text(separator='\n', strip=True) if article_body else soup.get_text(separator='\n', strip=True)
-        return re.sub(r'\n{2,}', '\n\n', text).strip()
-
-    except Exception as e:
-        print(f"❌ Ошибка при загрузке {URL}: {e}")
-        return f"Ошибка: {str(e)}"
-
-def compare_texts(original_text, lib_text):
-    """Сравнивает два текста и возвращает показатели"""
-
-    def normalize(text):
-        return re.sub(r'\s+', ' ', text.strip().lower())
-
-    matcher = difflib.SequenceMatcher(None, normalize(original_text), normalize(lib_text))
-    similarity = matcher.ratio() * 100  # Процент сходства
-
-    original_lines = [line.strip() for line in original_text.split('\n') if line.strip()]
-    lib_lines = [line.strip() for line in lib_text.split('\n') if line.strip()]
-
-    missing = [line for line in original_lines if normalize(line) not in normalize(lib_text)]
-    extra = [line for line in lib_lines if normalize(line) not in normalize(original_text)]
-
-    return {
-        'similarity': round(similarity, 2),
-        'original_length': len(original_text),
-        'lib_length': len(lib_text),
-        'missing_lines_count': len(missing),
-        'extra_lines_count': len(extra),
-        'example_missing': list(set(missing))[:3],
-        'example_extra': list(set(extra))[:3]
-    }
-
-def generate_ai_analysis(comparison_data):
-    """Генерирует аналитический отчет на основе сравнения текстов"""
-    analysis = []
-    
-    # Анализ сходства
-    similarity = comparison_data['similarity']
-    if similarity > 80:
-        analysis.append("✅ Тексты имеют высокое сходство (более 80%). Основное содержание сохранено.")
-    elif similarity > 50:
-        analysis.append("⚠️ Тексты имеют умеренное сходство (50-80%). Имеются существенные расхождения.")
-    else:
-        analysis.append("❌ Тексты имеют низкое сходство (менее 50%). Контент значительно отличается.")
-
-    # Анализ пропущенных строк
-    missing_count = comparison_data['missing_lines_count']
-    if missing_count > 0:
-        analysis.append(f"\n🔍 Пропущено строк: {missing_count}")
-        analysis.append("Наиболее значимые пропуски:")
-        for example in comparison_data['example_missing'][:3]:
-            analysis.append(f"- {example[:150]}{'...' if len(example) > 150 else ''}")
-    
-    # Анализ добавленных строк
-    extra_count = comparison_data['extra_lines_count']
-    if extra_count > 0:
-        analysis.append(f"\n🔍 Добавлено строк: {extra_count}")
-        analysis.append("Наиболее значимые добавления:")
-        for example in comparison_data['example_extra'][:3]:
-            analysis.append(f"- {example[:150]}{'...' if len(example) > 150 else ''}")
-
-    # Общий вывод
-    analysis.append("\n📌 Вывод:")
-    if missing_count > extra_count:
-        analysis.append("Основное расхождение - пропуск значительных частей оригинального текста.")
-    elif extra_count > missing_count:
-        analysis.append("Основное расхождение - добавление нового контента, отсутствующего в оригинале.")
-    else:
-        analysis.append("Расхождения включают как пропуски, так и добавления контента.")
-
-    return "\n".join(analysis)
-
-def save_results(results):
-    """Сохраняет результаты в JSON и CSV"""
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    json_path = os.path.join(OUTPUT_DIR, f'results_{timestamp}.json')
-    
-    # Формируем полный отчет с AI-анализом
-    full_report = {
-        "metadata": {
-            "generated_at": datetime.now().isoformat(),
-            "source_csv": INPUT_CSV,
-            "total_articles": len(results),
-            "successful": len([r for r in results if r['status'] == 'success']),
-            "failed": len([r for r in results if r['status'] == 'error'])
-        },
-        "articles": []
-    }
-    
-    for result in results:
-        article_data = {
-            "url": result['url'],
-            "status": result['status'],
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        if result['status'] == 'success':
-            article_data.update({
-                "similarity": result['similarity'],
-                "length_analysis": {
-                    "original": result['original_length'],
-                    "lib": result['lib_length'],
-                    "difference": abs(result['original_length'] - result['lib_length'])
-                },
-                "content_differences": {
-                    "missing_lines": result['missing_lines_count'],
-                    "extra_lines": result['extra_lines_count'],
-                    "example_missing": result['example_missing'],
-                    "example_extra": result['example_extra']
-                },
-                "ai_analysis": generate_ai_analysis(result)
-            })
-        else:
-            article_data['error'] = result['error']
-        
-        full_report["articles"].append(article_data)
-    
-    # Сохраняем JSON
-    with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump(full_report, f, ensure_ascii=False, indent=2, default=str)
-    
-    # Сохраняем CSV (упрощенная версия)
-    csv_path = os.path.join(OUTPUT_DIR, f'results_{timestamp}.csv')
-    pd.DataFrame(results).to_csv(csv_path, index=False, encoding='utf-8-sig')
-    
-    print(f"\n✅ Результаты сохранены:\n- Полный отчет: {json_path}\n- Таблица данных: {csv_path}")
-
-def generate_comprehensive_report(results):
-    """Генерирует комплексный отчет в формате Excel"""
-    from openpyxl import Workbook
-    from openpyxl.styles import Font, Alignment, PatternFill
-    from openpyxl.utils import get_column_letter
-    
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    report_path = os.path.join(OUTPUT_DIR, f'comprehensive_report_{timestamp}.xlsx')
-    
-    # Создаем книгу Excel
-    wb = Workbook()
-    
-    # === Лист 1: Сводка ===
-    ws_summary = wb.active
-    ws_summary.title = "Сводка"
-    
-    # Заголовки
-    headers = [
-        "URL", "Сходство (%)", "Статус",
-        "Длина эталона", "Длина извлеченного", "Разница",
-        "Пропущено строк", "Добавлено строк", "Оценка значимости пропусков",
-        "Комментарий (советы по улучшению)"  # Новый столбец
-    ]
-    
-    for col_num, header in enumerate(headers, 1):
-        ws_summary.cell(row=1, column=col_num, value=header).font = Font(bold=True)
-    
-    # Данные
-    for row_num, result in enumerate(results, 2):
-        ws_summary.cell(row=row_num, column=1, value=result['url'])
-        
-        if result['status'] == 'success':
-            ws_summary.cell(row=row_num, column=2, value=result['similarity'])
-            ws_summary.cell(row=row_num, column=4, value=result['original_length'])
-            ws_summary.cell(row=row_num, column=5, value=result['lib_length'])
-            ws_summary.cell(row=row_num, column=6, value=abs(result['original_length'] - result['lib_length']))
-            ws_summary.cell(row=row_num, column=7, value=result['missing_lines_count'])
-            ws_summary.cell(row=row_num, column=8, value=result['extra_lines_count'])
-            
-            # Оценка значимости пропусков
-            missing_importance = "Низкая"
-            if result['missing_lines_count'] > 10:
-                missing_importance = "Средняя"
-            if result['missing_lines_count'] > 30 or any(len(ex) > 100 for ex in result['example_missing']):
-                missing_importance = "Высокая"
-            ws_summary.cell(row=row_num, column=9, value=missing_importance)
-            
-            # Генерация комментариев для улучшения (новый столбец)
-            comments = []
-            
-            # Советы по пропущенному контенту
-            if result['missing_lines_count'] > 0:
-                if any(re.search(r'(адрес|контакт|телефон)', ex, re.I) for ex in result['example_missing']):
-                    comments.append("Добавить обработку контактных данных.")
-                if any(re.search(r'(вывод|заключение|итог)', ex, re.I) for ex in result['example_missing']):
-                    comments.append("Улучшить извлечение ключевых выводов.")
-                if result['missing_lines_count'] > 15:
-                    comments.append("Расширить правила парсинга для этого типа контента.")
-            
-            # Советы по добавленному контенту
-            if result['extra_lines_count'] > 0:
-                if any(re.search(r'(реклам|промо|акци)', ex, re.I) for ex in result['example_extra']):
-                    comments.append("Добавить фильтрацию рекламного контента.")
-                if result['extra_lines_count'] > 10:
-                    comments.append("Проверить правила исключения нерелевантных блоков.")
-            
-            # Общие советы
-            if result['similarity'] < 50:
-                comments.append("Требуется глубокая оптимизация парсинга.")
-            elif result['similarity'] < 70:
-                comments.append("Рекомендуется донастройка правил извлечения.")
-            
-            # Если нет особых проблем
-            if not comments and result['similarity'] > 80:
-                comments.append("Качество извлечения хорошее. Можно оптимизировать обработку специфичных элементов.")
-            
-            ws_summary.cell(row=row_num, column=10, value="\n".join(comments) if comments else "Не требует значительных улучшений")
-        else:
-            ws_summary.cell(row=row_num, column=2, value="N/A")
-            error = result.get('error', 'Неизвестная ошибка')
-            
-            # Советы по ошибкам
-            error_advice = {
-                'timeout': "Увеличить таймаут запросов или добавить повторные попытки.",
-                '404': "Проверить актуальность URL.",
-                '403': "Добавить обработку запрещенных запросов или изменить User-Agent."
-            }
-            
-            advice = "Общие рекомендации: проверить доступность ресурса."
-            for err_key, err_advice in error_advice.items():
-                if err_key in error.lower():
-                    advice = err_advice
-                    break
-            
-            ws_summary.cell(row=row_num, column=10, value=f"Ошибка: {error}\nРекомендация: {advice}")
-        
-        ws_summary.cell(row=row_num, column=3, value="Успех" if result['status'] == 'success' else "Ошибка")
-    
-    # Форматирование
-    for column in ws_summary.columns:
-        max_length = 0
-        column = [cell for cell in column]
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = (max_length + 2) * 1.2
-        ws_summary.column_dimensions[get_column_letter(column[0].column)].width = adjusted_width
-    
-    # Настройка переноса текста для столбца с комментариями
-    for row in ws_summary.iter_rows(min_row=2, max_col=10, max_row=len(results)+1):
-        row[9].alignment = Alignment(wrapText=True, vertical='top')  # 10-й столбец (индекс 9)
-    
-    # === Лист 2: Детали сравнения ===
-    ws_details = wb.create_sheet("Детали сравнения")
-    
-    # Заголовки
-    headers = [
-        "URL", "Примеры пропущенных строк", "Примеры добавленных строк", 
-        "Анализ значимости", "Рекомендации"
-    ]
-    
-    for col_num, header in enumerate(headers, 1):
-        ws_details.cell(row=1, column=col_num, value=header).font = Font(bold=True)
-    
-    # Данные
-    for row_num, result in enumerate(results, 2):
-        ws_details.cell(row=row_num, column=1, value=result['url'])
-        
-        if result['status'] == 'success':
-            # Примеры пропущенных строк
-            missing_examples = "\n".join([f"- {ex[:200]}{'...' if len(ex) > 200 else ''}" 
-                                         for ex in result['example_missing']])
-            ws_details.cell(row=row_num, column=2, value=missing_examples)
-            
-            # Примеры добавленных строк
-            extra_examples = "\n".join([f"- {ex[:200]}{'...' if len(ex) > 200 else ''}" 
-                                      for ex in result['example_extra']])
-            ws_details.cell(row=row_num, column=3, value=extra_examples)
-            
-            # Анализ значимости
-            analysis = []
-            if result['missing_lines_count'] > 0:
-                analysis.append(f"Пропущено {result['missing_lines_count']} строк. ")
-                if any(re.search(r'(адрес|контакт|телефон|почта)', ex, re.I) for ex in result['example_missing']):
-                    analysis.append("Пропущены контактные данные. ")
-                if any(re.search(r'(вывод|заключение|итог)', ex, re.I) for ex in result['example_missing']):
-                    analysis.append("Пропущены ключевые выводы. ")
-            
-            if result['extra_lines_count'] > 0:
-                analysis.append(f"Добавлено {result['extra_lines_count']} строк. ")
-                if any(re.search(r'(политик|экономик|конфликт)', ex, re.I) for ex in result['example_extra']):
-                    analysis.append("Добавлен политизированный контент. ")
-            
-            ws_details.cell(row=row_num, column=4, value=" ".join(analysis) if analysis else "Незначительные расхождения")
-            
-            # Рекомендации
-            recommendations = []
-            if result['similarity'] < 50:
-                recommendations.append("Требуется ручная проверка - низкое сходство.")
-            elif result['similarity'] < 80:
-                recommendations.append("Рекомендуется выборочная проверка.")
-            
-            if result['missing_lines_count'] > result['extra_lines_count']:
-                recommendations.append("Проверить полноту извлечения контента.")
-            elif result['extra_lines_count'] > result['missing_lines_count']:
-                recommendations.append("Проверить на наличие нерелевантного контента.")
-            
-            ws_details.cell(row=row_num, column=5, value=" ".join(recommendations) if recommendations else "Приемлемый результат")
-        else:
-            ws_details.cell(row=row_num, column=2, value=result['error'])
-    
-    # Настройка переноса текста
-    for row in ws_details.iter_rows():
-        for cell in row:
-            cell.alignment = Alignment(wrapText=True, vertical='top')
-    
-    # === Лист 3: Аналитика ===
-    ws_analytics = wb.create_sheet("Аналитика")
-    
-    # Статистика
-    stats = [
-        ["Всего статей", len(results)],
-        ["Успешно обработано", len([r for r in results if r['status'] == 'success'])],
-        ["Ошибки обработки", len([r for r in results if r['status'] == 'error'])],
-        ["Среднее сходство", np.mean([r['similarity'] for r in results if r['status'] == 'success']) if any(r['status'] == 'success' for r in results) else "N/A"],
-        ["Максимальное сходство", max([r['similarity'] for r in results if r['status'] == 'success']) if any(r['status'] == 'success' for r in results) else "N/A"],
-        ["Минимальное сходство", min([r['similarity'] for r in results if r['status'] == 'success']) if any(r['status'] == 'success' for r in results) else "N/A"]
-    ]
-    
-    for row_num, stat in enumerate(stats, 1):
-        ws_analytics.cell(row=row_num, column=1, value=stat[0]).font = Font(bold=True)
-        ws_analytics.cell(row=row_num, column=2, value=stat[1])
-    
-    # Заключение
-    conclusion = [
-        "Заключение и рекомендации:",
-        "",
-        "1. Общая эффективность работы библиотеки:",
-        f"- {'Высокая' if len([r for r in results if r['status'] == 'success' and r['similarity'] > 80]) / len(results) > 0.7 else 'Средняя' if len([r for r in results if r['status'] == 'success' and r['similarity'] > 50]) / len(results) > 0.7 else 'Низкая'} эффективность",
-        "",
-        "2. Основные проблемы:",
-        "- Пропуск ключевых фрагментов текста" if any(r['status'] == 'success' and r['missing_lines_count'] > 10 for r in results) else "",
-        "- Добавление нерелевантного контента" if any(r['status'] == 'success' and r['extra_lines_count'] > 10 for r in results) else "",
-        "",
-        "3. Рекомендации по улучшению:",
-        "- Уточнить правила извлечения контента для уменьшения пропусков",
-        "- Добавить проверку на релевантность извлекаемого контента",
-        "- Реализовать обработку ошибок для проблемных URL",
-        "",
-        "4. Дополнительные предложения:",
-        "- Внедрить ML-модель для оценки качества контента",
-        "- Добавить систему оценки тональности текста",
-        "- Реализовать сравнение с несколькими источниками"
-    ]
-    
-    for row_num, line in enumerate(conclusion, len(stats) + 2):
-        ws_analytics.cell(row=row_num, column=1, value=line)
-    
-    # Сохраняем файл
-    wb.save(report_path)
-    print(f"\n📊 Комплексный отчет сохранен: {report_path}")
-
-
-def generate_improvement_tips(article):
-    """Генерирует советы по улучшению для конкретной статьи"""
-    tips = []
-    
-    if article['similarity'] < 50:
-        tips.append("• Требуется серьезная доработка парсера для этого типа контента")
-    elif article['similarity'] < 70:
-        tips.append("• Рекомендуется оптимизация правил извлечения")
-    
-    if article['missing_lines_count'] > 10:
-        tips.append("• Увеличить глубину анализа для уменьшения пропусков")
-    
-    if article['extra_lines_count'] > 5:
-        tips.append("• Добавить фильтрацию нерелевантных блоков")
-    
-    if any('реклам' in ex.lower() for ex in article['example_extra']):
-        tips.append("• Внедрить систему распознавания рекламного контента")
-    
-    if not tips:
-        tips.append("• Качество извлечения удовлетворительное. Можно оптимизировать обработку специфичных элементов")
-    
-    return "<br>".join(tips)
-
-def main():
-    ensure_directory_exists()
-    results = []
-
-    print("=== Автоматический анализ текстов ===")
-    print(f"Загружаем данные из файла: {INPUT_CSV}")
-
-    try:
-        df_input = pd.read_csv(INPUT_CSV, on_bad_lines='skip', sep=None, engine='python', encoding='utf-8-sig')
-        df_input.columns = df_input.columns.str.strip()
-        
-        if not all(col.lower() in [c.lower() for c in df_input.columns] for col in ['URL', 'lib_text']):
-            print("❌ Ошибка: Не найдены необходимые колонки!")
-            return
-
-        print(f"\n✅ Найдено {len(df_input)} записей. Начинаем обработку...\n")
-
-        for idx, row in tqdm(df_input.iterrows(), total=len(df_input), desc="Обработка статей"):
-            url = str(row['URL']).strip()
-            lib_text = str(row['lib_text']).strip()
-
-            if not lib_text:
-                tqdm.write(f"⚠️ [{idx+1}] lib_text пустой. Пропускаем...")
-                continue
-
-            try:
-                original_text = extract_text_from_url(url)
-                
-                if original_text.startswith("Ошибка"):
-                    results.append({
-                        'url': url,
-                        'status': 'error',
-                        'error': original_text
-                    })
-                    continue
-
-                comparison = compare_texts(original_text, lib_text)
-                results.append({
-                    'url': url,
-                    'similarity': comparison['similarity'],
-                    'original_length': comparison['original_length'],
-                    'lib_length': comparison['lib_length'],
-                    'missing_lines_count': comparison['missing_lines_count'],
-                    'extra_lines_count': comparison['extra_lines_count'],
-                    'example_missing': comparison['example_missing'],
-                    'example_extra': comparison['example_extra'],
-                    'status': 'success'
-                })
-
-            except Exception as e:
-                results.append({
-                    'url': url,
-                    'status': 'error',
-                    'error': str(e)
-                })
-                tqdm.write(f"❌ [{idx+1}] Ошибка обработки {url}: {str(e)}")
-
-        # Сохранение результатов
-        save_results(results)
-        generate_comprehensive_report(results)
-        generate_html_report(results, OUTPUT_DIR)
-
-    except Exception as e:
-        print(f"❌ Не удалось обработать файл: {e}")
-        return
-
-if __name__ == "__main__":
-    main()
+import pandas as pd
+import requests
+from bs4 import BeautifulSoup, SoupStrainer
+import csv
+import difflib
+import re
+import os
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import json
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize as l2_normalize
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from openpyxl.styles import Font, Alignment
+from tqdm import tqdm
+from html_report import generate_html_report
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None  # Без aiohttp работаем последовательно через requests
+
+try:
+    from aiohttp_client_cache import CachedSession as AioCachedSession, SQLiteBackend
+except ImportError:
+    AioCachedSession = None  # Без aiohttp-client-cache асинхронный путь качает без кэша
+
+try:
+    from rapidfuzz import fuzz
+except ImportError:
+    fuzz = None  # Без rapidfuzz считаем сходство через difflib
+
+try:
+    import requests_cache
+except ImportError:
+    requests_cache = None  # Без requests-cache каждый запуск скачивает статьи заново
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Без orjson сериализуем отчёт стандартным json
+
+# --- Конфигурация ---
+INPUT_CSV = r".\Test_check.csv"
+OUTPUT_DIR = "results"
+PARALLEL = 4  # Число одновременных загрузок
+FETCH_RETRIES = 3
+MAX_BYTES = 5_000_000  # Больше этого от страницы не читаем
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Общая сессия с пулом соединений: Keep-Alive экономит TCP/TLS-рукопожатие на каждый URL.
+# С requests-cache ответы последовательного пути сохраняются на диск; асинхронный путь
+# кэширует через aiohttp-client-cache (см. fetch_all)
+if requests_cache is not None:
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    SESSION = requests_cache.CachedSession(
+        cache_name=os.path.join(OUTPUT_DIR, '.http_cache'),
+        expire_after=86400
+    )
+else:
+    SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+_adapter = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=64,
+    max_retries=Retry(total=FETCH_RETRIES, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
+)
+SESSION.mount('http://', _adapter)
+SESSION.mount('https://', _adapter)
+
+# lxml парсит HTML на порядок быстрее стандартного html.parser
+try:
+    import lxml  # noqa: F401
+    BS_PARSER = 'lxml'
+except ImportError:
+    BS_PARSER = 'html.parser'
+
+# Разбираем только поддеревья, в которых может лежать текст статьи
+STRAINER = SoupStrainer(['article', 'div', 'body'])
+
+# Все регулярные выражения компилируем один раз на модуль
+RE_WS = re.compile(r'\s+')
+RE_BLANK = re.compile(r'\n{2,}')
+RE_ARTICLE_CLASS = re.compile(r'(post-body|article-text|entry-content|articleBody)', re.I)
+RE_CONTACT = re.compile(r'(адрес|контакт|телефон|почта)', re.I)
+RE_CONCLUSION = re.compile(r'(вывод|заключение|итог)', re.I)
+RE_AD = re.compile(r'(реклам|промо|акци)', re.I)
+RE_POLITICS = re.compile(r'(политик|экономик|конфликт)', re.I)
+
+# Единые стили Excel-отчёта: один объект на модуль вместо аллокации на каждую ячейку
+BOLD = Font(bold=True)
+WRAP = Alignment(wrapText=True, vertical='top')
+
+# --- Функции ---
+
+def ensure_directory_exists():
+    if not os.path.exists(OUTPUT_DIR):
+        os.makedirs(OUTPUT_DIR)
+
+def read_input_csv(path):
+    """Читает входной CSV: через pyarrow-движок, если он доступен"""
+    try:
+        # pyarrow требует явный разделитель — определяем его по первым 8КБ
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            dialect = csv.Sniffer().sniff(f.read(8192))
+        return pd.read_csv(path, sep=dialect.delimiter, engine='pyarrow', encoding='utf-8-sig')
+    except (ImportError, ValueError, csv.Error):
+        # pyarrow не установлен или разделитель не распознан — прежний python-движок
+        return pd.read_csv(path, on_bad_lines='skip', sep=None, engine='python', encoding='utf-8-sig')
+
+# Теги, не несущие текста статьи
+NOISE_TAGS = ['script', 'style', 'nav', 'footer', 'iframe', 'img', 'button']
+
+def parse_article_html(html):
+    """Извлекает основной текст статьи из HTML-страницы.
+
+    Дерево строится ровно один раз на ответ — повторный разбор того же HTML
+    (BeautifulSoup(str(soup))) обходится в десятки-сотни мс на больших страницах.
+    """
+    soup = BeautifulSoup(html, BS_PARSER, parse_only=STRAINER)
+
+    # Удаляем ненужные элементы одним обходом дерева
+    for element in soup.find_all(NOISE_TAGS):
+        element.decompose()
+
+    # Поиск основного контента
+    article_body = (
+        soup.find('article') or
+        soup.find(class_=RE_ARTICLE_CLASS) or
+        soup.find(itemprop='articleBody') or
+        soup.find('div', class_='article__text') or
+        soup.find('body')
+    )
+
+    text = article_body.get_text(separator='\n', strip=True) if article_body else soup.get_text(separator='\n', strip=True)
+    return RE_BLANK.sub('\n\n', text).strip()
+
+def extract_text_from_url(URL):
+    """Извлекает основной текст статьи по URL (последовательный вариант)"""
+    try:
+        response = SESSION.get(URL, stream=True, timeout=20)
+        response.raise_for_status()
+
+        content_type = response.headers.get('Content-Type', '')
+        if not content_type.startswith('text/html'):
+            raise ValueError(f"не HTML-ответ (Content-Type: {content_type or 'неизвестен'})")
+
+        # Читаем не больше MAX_BYTES: защита от гигантских страниц и бинарных ответов.
+        # Байты отдаём парсеру как есть — определение кодировки остаётся на нём
+        return parse_article_html(response.raw.read(MAX_BYTES, decode_content=True))
+
+    except Exception as e:
+        print(f"❌ Ошибка при загрузке {URL}: {e}")
+        return f"Ошибка: {str(e)}"
+
+async def fetch_text(session, url, sem):
+    """Асинхронно загружает страницу и извлекает текст статьи"""
+    loop = asyncio.get_running_loop()
+    for attempt in range(FETCH_RETRIES):
+        try:
+            async with sem:
+                async with session.get(url, timeout=aiohttp.ClientTimeout(total=20)) as response:
+                    response.raise_for_status()
+
+                    content_type = response.headers.get('Content-Type', '')
+                    if not content_type.startswith('text/html'):
+                        raise ValueError(f"не HTML-ответ (Content-Type: {content_type or 'неизвестен'})")
+
+                    html = await response.content.read(MAX_BYTES)
+            # Парсим в пуле потоков, чтобы не блокировать event loop
+            return await loop.run_in_executor(None, parse_article_html, html)
+        except ValueError as e:
+            # Не-HTML контент повторными попытками не лечится
+            print(f"❌ Ошибка при загрузке {url}: {e}")
+            return f"Ошибка: {str(e)}"
+        except Exception as e:
+            if attempt == FETCH_RETRIES - 1:
+                print(f"❌ Ошибка при загрузке {url}: {e}")
+                return f"Ошибка: {str(e)}"
+            # Экспоненциальная пауза перед повторной попыткой (как у tenacity)
+            await asyncio.sleep(min(4 * 2 ** attempt, 10))
+
+async def fetch_all(urls, parallel):
+    """Загружает все URL параллельно через один aiohttp-сеанс"""
+    sem = asyncio.BoundedSemaphore(parallel)
+    connector = aiohttp.TCPConnector(limit=parallel, limit_per_host=8)
+    if AioCachedSession is not None:
+        # Тот же дисковый кэш на сутки, что и у requests-cache в последовательном
+        # пути: повторный запуск по тому же CSV не качает статьи заново
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        session = AioCachedSession(
+            cache=SQLiteBackend(
+                cache_name=os.path.join(OUTPUT_DIR, '.http_cache_async'),
+                expire_after=86400
+            ),
+            connector=connector,
+            headers=HEADERS
+        )
+    else:
+        session = aiohttp.ClientSession(connector=connector, headers=HEADERS)
+    async with session:
+        tasks = [fetch_text(session, url, sem) for url in urls]
+        return await asyncio.gather(*tasks)
+
+def fetch_texts(urls, parallel=PARALLEL):
+    """Загружает тексты всех статей: параллельно, если доступен aiohttp"""
+    # Каждый уникальный URL скачиваем и парсим один раз, даже если он повторяется в CSV
+    unique_urls = list(dict.fromkeys(urls))
+    if aiohttp is not None:
+        texts = asyncio.run(fetch_all(unique_urls, parallel))
+    else:
+        texts = [extract_text_from_url(url) for url in tqdm(unique_urls, desc="Загрузка статей")]
+    by_url = dict(zip(unique_urls, texts))
+    return [by_url[url] for url in urls]
+
+def first_unique(lines, limit=3):
+    """Возвращает первые limit уникальных строк, не хэшируя список целиком"""
+    examples = []
+    seen = set()
+    for line in lines:
+        if line in seen:
+            continue
+        seen.add(line)
+        examples.append(line)
+        if len(examples) == limit:
+            break
+    return examples
+
+def compare_texts(original_text, lib_text):
+    """Сравнивает два текста и возвращает показатели"""
+
+    def normalize(text):
+        return RE_WS.sub(' ', text.strip().lower())
+
+    norm_orig = normalize(original_text)
+    norm_lib = normalize(lib_text)
+
+    if fuzz is not None:
+        # C++-реализация того же коэффициента — на порядки быстрее на длинных текстах
+        similarity = fuzz.ratio(norm_orig, norm_lib)
+    else:
+        matcher = difflib.SequenceMatcher(None, norm_orig, norm_lib)
+        similarity = matcher.ratio() * 100  # Процент сходства
+
+    original_lines = [line.strip() for line in original_text.split('\n') if line.strip()]
+    lib_lines = [line.strip() for line in lib_text.split('\n') if line.strip()]
+
+    # Нормализуем каждую строку один раз и ищем по множествам вместо
+    # пересканирования всего текста на каждую строку
+    orig_norm = [normalize(line) for line in original_lines]
+    lib_norm = [normalize(line) for line in lib_lines]
+    orig_norm_set = set(orig_norm)
+    lib_norm_set = set(lib_norm)
+
+    missing = [line for line, norm in zip(original_lines, orig_norm) if norm not in lib_norm_set]
+    extra = [line for line, norm in zip(lib_lines, lib_norm) if norm not in orig_norm_set]
+
+    return {
+        'similarity': round(similarity, 2),
+        'original_length': len(original_text),
+        'lib_length': len(lib_text),
+        'missing_lines_count': len(missing),
+        'extra_lines_count': len(extra),
+        'example_missing': first_unique(missing),
+        'example_extra': first_unique(extra)
+    }
+
+def _compare_worker(task):
+    """Сравнивает одну пару текстов (выполняется в отдельном процессе)"""
+    url, original_text, lib_text = task
+    try:
+        comparison = compare_texts(original_text, lib_text)
+        # Ключевые признаки считаем один раз: отчётам достаточно готовых булевых флагов
+        joined_missing = '\n'.join(comparison['example_missing'])
+        joined_extra = '\n'.join(comparison['example_extra'])
+        return {
+            'url': url,
+            'similarity': comparison['similarity'],
+            'original_length': comparison['original_length'],
+            'lib_length': comparison['lib_length'],
+            'missing_lines_count': comparison['missing_lines_count'],
+            'extra_lines_count': comparison['extra_lines_count'],
+            'example_missing': comparison['example_missing'],
+            'example_extra': comparison['example_extra'],
+            'has_contact_missing': RE_CONTACT.search(joined_missing) is not None,
+            'has_conclusion_missing': RE_CONCLUSION.search(joined_missing) is not None,
+            'has_ad_extra': RE_AD.search(joined_extra) is not None,
+            'has_politics_extra': RE_POLITICS.search(joined_extra) is not None,
+            'status': 'success'
+        }
+    except Exception as e:
+        return {
+            'url': url,
+            'status': 'error',
+            'error': str(e)
+        }
+
+def compute_cosine_similarities(original_texts, lib_texts):
+    """Считает TF-IDF косинусное сходство одним батчем для всех пар текстов"""
+    vectorizer = TfidfVectorizer()
+    X = vectorizer.fit_transform(original_texts + lib_texts)
+    X = l2_normalize(X, norm='l2', copy=False)
+
+    n = len(original_texts)
+    # После L2-нормализации косинус пары — это скалярное произведение строк,
+    # т.е. диагональ X_orig @ X_lib.T без вычисления всей матрицы NxN
+    pairwise = X[:n].multiply(X[n:]).sum(axis=1)
+    return np.asarray(pairwise).ravel()
+
+def generate_ai_analysis(comparison_data):
+    """Генерирует аналитический отчет на основе сравнения текстов"""
+    analysis = []
+    
+    # Анализ сходства
+    similarity = comparison_data['similarity']
+    if similarity > 80:
+        analysis.append("✅ Тексты имеют высокое сходство (более 80%). Основное содержание сохранено.")
+    elif similarity > 50:
+        analysis.append("⚠️ Тексты имеют умеренное сходство (50-80%). Имеются существенные расхождения.")
+    else:
+        analysis.append("❌ Тексты имеют низкое сходство (менее 50%). Контент значительно отличается.")
+
+    # Анализ пропущенных строк
+    missing_count = comparison_data['missing_lines_count']
+    if missing_count > 0:
+        analysis.append(f"\n🔍 Пропущено строк: {missing_count}")
+        analysis.append("Наиболее значимые пропуски:")
+        for example in comparison_data['example_missing'][:3]:
+            analysis.append(f"- {example[:150]}{'...' if len(example) > 150 else ''}")
+    
+    # Анализ добавленных строк
+    extra_count = comparison_data['extra_lines_count']
+    if extra_count > 0:
+        analysis.append(f"\n🔍 Добавлено строк: {extra_count}")
+        analysis.append("Наиболее значимые добавления:")
+        for example in comparison_data['example_extra'][:3]:
+            analysis.append(f"- {example[:150]}{'...' if len(example) > 150 else ''}")
+
+    # Общий вывод
+    analysis.append("\n📌 Вывод:")
+    if missing_count > extra_count:
+        analysis.append("Основное расхождение - пропуск значительных частей оригинального текста.")
+    elif extra_count > missing_count:
+        analysis.append("Основное расхождение - добавление нового контента, отсутствующего в оригинале.")
+    else:
+        analysis.append("Расхождения включают как пропуски, так и добавления контента.")
+
+    return "\n".join(analysis)
+
+def save_results(results):
+    """Сохраняет результаты в JSON и CSV"""
+    # Время отчёта одно на все записи — берём его один раз
+    now = datetime.now()
+    timestamp = now.strftime('%Y%m%d_%H%M%S')
+    now_iso = now.isoformat()
+    json_path = os.path.join(OUTPUT_DIR, f'results_{timestamp}.json')
+
+    # Формируем полный отчет с AI-анализом
+    success_count = sum(1 for r in results if r['status'] == 'success')
+    full_report = {
+        "metadata": {
+            "generated_at": now_iso,
+            "source_csv": INPUT_CSV,
+            "total_articles": len(results),
+            "successful": success_count,
+            "failed": len(results) - success_count
+        },
+        "articles": []
+    }
+    
+    for result in results:
+        article_data = {
+            "url": result['url'],
+            "status": result['status'],
+            "timestamp": now_iso
+        }
+        
+        if result['status'] == 'success':
+            article_data.update({
+                "similarity": result['similarity'],
+                "cosine_similarity": result.get('cosine_similarity'),
+                "length_analysis": {
+                    "original": result['original_length'],
+                    "lib": result['lib_length'],
+                    "difference": abs(result['original_length'] - result['lib_length'])
+                },
+                "content_differences": {
+                    "missing_lines": result['missing_lines_count'],
+                    "extra_lines": result['extra_lines_count'],
+                    "example_missing": result['example_missing'],
+                    "example_extra": result['example_extra']
+                },
+                "ai_analysis": generate_ai_analysis(result)
+            })
+        else:
+            article_data['error'] = result['error']
+        
+        full_report["articles"].append(article_data)
+    
+    # Сохраняем JSON: orjson сериализует в разы быстрее и понимает numpy/datetime без default=str
+    if orjson is not None:
+        with open(json_path, 'wb') as f:
+            f.write(orjson.dumps(full_report, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(full_report, f, ensure_ascii=False, indent=2, default=str)
+    
+    # Сохраняем CSV (упрощенная версия)
+    csv_path = os.path.join(OUTPUT_DIR, f'results_{timestamp}.csv')
+    pd.DataFrame(results).to_csv(csv_path, index=False, encoding='utf-8-sig')
+    
+    print(f"\n✅ Результаты сохранены:\n- Полный отчет: {json_path}\n- Таблица данных: {csv_path}")
+
+def generate_comprehensive_report(results):
+    """Генерирует комплексный отчет в формате Excel"""
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.utils import get_column_letter
+
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    report_path = os.path.join(OUTPUT_DIR, f'comprehensive_report_{timestamp}.xlsx')
+
+    bold = BOLD
+    wrap = WRAP
+
+    def styled(ws, value, font=None, alignment=None):
+        cell = WriteOnlyCell(ws, value=value)
+        if font is not None:
+            cell.font = font
+        if alignment is not None:
+            cell.alignment = alignment
+        return cell
+
+    # === Лист 1: Сводка (значения строк) ===
+    summary_headers = [
+        "URL", "Сходство (%)", "Статус",
+        "Длина эталона", "Длина извлеченного", "Разница",
+        "Пропущено строк", "Добавлено строк", "Оценка значимости пропусков",
+        "Комментарий (советы по улучшению)"
+    ]
+
+    summary_rows = []
+    for result in results:
+        if result['status'] == 'success':
+            # Оценка значимости пропусков
+            missing_importance = "Низкая"
+            if result['missing_lines_count'] > 10:
+                missing_importance = "Средняя"
+            if result['missing_lines_count'] > 30 or any(len(ex) > 100 for ex in result['example_missing']):
+                missing_importance = "Высокая"
+
+            # Генерация комментариев для улучшения
+            comments = []
+
+            # Советы по пропущенному контенту
+            if result['missing_lines_count'] > 0:
+                if result['has_contact_missing']:
+                    comments.append("Добавить обработку контактных данных.")
+                if result['has_conclusion_missing']:
+                    comments.append("Улучшить извлечение ключевых выводов.")
+                if result['missing_lines_count'] > 15:
+                    comments.append("Расширить правила парсинга для этого типа контента.")
+
+            # Советы по добавленному контенту
+            if result['extra_lines_count'] > 0:
+                if result['has_ad_extra']:
+                    comments.append("Добавить фильтрацию рекламного контента.")
+                if result['extra_lines_count'] > 10:
+                    comments.append("Проверить правила исключения нерелевантных блоков.")
+
+            # Общие советы
+            if result['similarity'] < 50:
+                comments.append("Требуется глубокая оптимизация парсинга.")
+            elif result['similarity'] < 70:
+                comments.append("Рекомендуется донастройка правил извлечения.")
+
+            # Если нет особых проблем
+            if not comments and result['similarity'] > 80:
+                comments.append("Качество извлечения хорошее. Можно оптимизировать обработку специфичных элементов.")
+
+            summary_rows.append([
+                result['url'],
+                result['similarity'],
+                "Успех",
+                result['original_length'],
+                result['lib_length'],
+                abs(result['original_length'] - result['lib_length']),
+                result['missing_lines_count'],
+                result['extra_lines_count'],
+                missing_importance,
+                "\n".join(comments) if comments else "Не требует значительных улучшений"
+            ])
+        else:
+            error = result.get('error', 'Неизвестная ошибка')
+
+            # Советы по ошибкам
+            error_advice = {
+                'timeout': "Увеличить таймаут запросов или добавить повторные попытки.",
+                '404': "Проверить актуальность URL.",
+                '403': "Добавить обработку запрещенных запросов или изменить User-Agent."
+            }
+
+            advice = "Общие рекомендации: проверить доступность ресурса."
+            for err_key, err_advice in error_advice.items():
+                if err_key in error.lower():
+                    advice = err_advice
+                    break
+
+            summary_rows.append([
+                result['url'], "N/A", "Ошибка",
+                None, None, None, None, None, None,
+                f"Ошибка: {error}\nРекомендация: {advice}"
+            ])
+
+    # Ширину столбцов считаем по ходу — в write-only режиме ячейки не обойти повторно.
+    # Предел в 60 символов не даёт длинным комментариям раздувать колонку
+    MAX_COL_WIDTH = 60
+    widths = [len(h) for h in summary_headers]
+    for row in summary_rows:
+        for col, value in enumerate(row):
+            if value is not None and widths[col] < MAX_COL_WIDTH:
+                widths[col] = min(max(widths[col], len(str(value))), MAX_COL_WIDTH)
+
+    # === Лист 2: Детали сравнения (значения строк) ===
+    details_headers = [
+        "URL", "Примеры пропущенных строк", "Примеры добавленных строк",
+        "Анализ значимости", "Рекомендации"
+    ]
+
+    details_rows = []
+    for result in results:
+        if result['status'] == 'success':
+            # Примеры пропущенных строк
+            missing_examples = "\n".join([f"- {ex[:200]}{'...' if len(ex) > 200 else ''}"
+                                         for ex in result['example_missing']])
+
+            # Примеры добавленных строк
+            extra_examples = "\n".join([f"- {ex[:200]}{'...' if len(ex) > 200 else ''}"
+                                      for ex in result['example_extra']])
+
+            # Анализ значимости
+            analysis = []
+            if result['missing_lines_count'] > 0:
+                analysis.append(f"Пропущено {result['missing_lines_count']} строк. ")
+                if result['has_contact_missing']:
+                    analysis.append("Пропущены контактные данные. ")
+                if result['has_conclusion_missing']:
+                    analysis.append("Пропущены ключевые выводы. ")
+
+            if result['extra_lines_count'] > 0:
+                analysis.append(f"Добавлено {result['extra_lines_count']} строк. ")
+                if result['has_politics_extra']:
+                    analysis.append("Добавлен политизированный контент. ")
+
+            # Рекомендации
+            recommendations = []
+            if result['similarity'] < 50:
+                recommendations.append("Требуется ручная проверка - низкое сходство.")
+            elif result['similarity'] < 80:
+                recommendations.append("Рекомендуется выборочная проверка.")
+
+            if result['missing_lines_count'] > result['extra_lines_count']:
+                recommendations.append("Проверить полноту извлечения контента.")
+            elif result['extra_lines_count'] > result['missing_lines_count']:
+                recommendations.append("Проверить на наличие нерелевантного контента.")
+
+            details_rows.append([
+                result['url'],
+                missing_examples,
+                extra_examples,
+                " ".join(analysis) if analysis else "Незначительные расхождения",
+                " ".join(recommendations) if recommendations else "Приемлемый результат"
+            ])
+        else:
+            details_rows.append([result['url'], result['error'], None, None, None])
+
+    # === Лист 3: Аналитика ===
+    # Статистика: один проход по results, дальше — NumPy-редукции по готовым массивам
+    success = [r for r in results if r['status'] == 'success']
+    sims = np.fromiter((r['similarity'] for r in success), dtype=np.float32, count=len(success))
+    missing_counts = np.fromiter((r['missing_lines_count'] for r in success), dtype=np.int64, count=len(success))
+    extra_counts = np.fromiter((r['extra_lines_count'] for r in success), dtype=np.int64, count=len(success))
+
+    stats = [
+        ["Всего статей", len(results)],
+        ["Успешно обработано", len(success)],
+        ["Ошибки обработки", len(results) - len(success)],
+        ["Среднее сходство", float(sims.mean()) if sims.size else "N/A"],
+        ["Максимальное сходство", float(sims.max()) if sims.size else "N/A"],
+        ["Минимальное сходство", float(sims.min()) if sims.size else "N/A"]
+    ]
+
+    # Заключение
+    conclusion = [
+        "Заключение и рекомендации:",
+        "",
+        "1. Общая эффективность работы библиотеки:",
+        f"- {'Высокая' if np.count_nonzero(sims > 80) / len(results) > 0.7 else 'Средняя' if np.count_nonzero(sims > 50) / len(results) > 0.7 else 'Низкая'} эффективность",
+        "",
+        "2. Основные проблемы:",
+        "- Пропуск ключевых фрагментов текста" if np.count_nonzero(missing_counts > 10) else "",
+        "- Добавление нерелевантного контента" if np.count_nonzero(extra_counts > 10) else "",
+        "",
+        "3. Рекомендации по улучшению:",
+        "- Уточнить правила извлечения контента для уменьшения пропусков",
+        "- Добавить проверку на релевантность извлекаемого контента",
+        "- Реализовать обработку ошибок для проблемных URL",
+        "",
+        "4. Дополнительные предложения:",
+        "- Внедрить ML-модель для оценки качества контента",
+        "- Добавить систему оценки тональности текста",
+        "- Реализовать сравнение с несколькими источниками"
+    ]
+
+    # Создаем книгу в write-only режиме: строки уходят на диск потоково,
+    # без материализации всех Cell-объектов в памяти
+    wb = Workbook(write_only=True)
+
+    ws_summary = wb.create_sheet("Сводка")
+    for col, width in enumerate(widths, 1):
+        ws_summary.column_dimensions[get_column_letter(col)].width = (width + 2) * 1.2
+    ws_summary.append([styled(ws_summary, h, font=bold) for h in summary_headers])
+    for row in summary_rows:
+        cells = [WriteOnlyCell(ws_summary, value=v) for v in row]
+        cells[9].alignment = wrap  # Столбец с комментариями
+        ws_summary.append(cells)
+
+    ws_details = wb.create_sheet("Детали сравнения")
+    ws_details.append([styled(ws_details, h, font=bold, alignment=wrap) for h in details_headers])
+    for row in details_rows:
+        ws_details.append([styled(ws_details, v, alignment=wrap) for v in row])
+
+    ws_analytics = wb.create_sheet("Аналитика")
+    for stat in stats:
+        ws_analytics.append([styled(ws_analytics, stat[0], font=bold), stat[1]])
+    ws_analytics.append([])
+    for line in conclusion:
+        ws_analytics.append([line])
+
+    # Сохраняем файл
+    wb.save(report_path)
+    print(f"\n📊 Комплексный отчет сохранен: {report_path}")
+
+
+def generate_improvement_tips(article):
+    """Генерирует советы по улучшению для конкретной статьи"""
+    tips = []
+    
+    if article['similarity'] < 50:
+        tips.append("• Требуется серьезная доработка парсера для этого типа контента")
+    elif article['similarity'] < 70:
+        tips.append("• Рекомендуется оптимизация правил извлечения")
+    
+    if article['missing_lines_count'] > 10:
+        tips.append("• Увеличить глубину анализа для уменьшения пропусков")
+    
+    if article['extra_lines_count'] > 5:
+        tips.append("• Добавить фильтрацию нерелевантных блоков")
+    
+    if article.get('has_ad_extra'):
+        tips.append("• Внедрить систему распознавания рекламного контента")
+    
+    if not tips:
+        tips.append("• Качество извлечения удовлетворительное. Можно оптимизировать обработку специфичных элементов")
+    
+    return "<br>".join(tips)
+
+def main(parallel=PARALLEL):
+    ensure_directory_exists()
+    results = []
+
+    print("=== Автоматический анализ текстов ===")
+    print(f"Загружаем данные из файла: {INPUT_CSV}")
+
+    try:
+        df_input = read_input_csv(INPUT_CSV)
+        df_input.columns = df_input.columns.str.strip()
+
+        if not all(col.lower() in [c.lower() for c in df_input.columns] for col in ['URL', 'lib_text']):
+            print("❌ Ошибка: Не найдены необходимые колонки!")
+            return
+
+        print(f"\n✅ Найдено {len(df_input)} записей. Начинаем обработку...\n")
+
+        # Собираем задания, пропуская строки без извлечённого текста.
+        # itertuples не создаёт Series на каждую строку, в отличие от iterrows
+        tasks = []
+        for idx, row in enumerate(df_input.itertuples(index=False), 1):
+            url = str(row.URL).strip()
+            lib_text = str(row.lib_text).strip()
+
+            if not lib_text:
+                print(f"⚠️ [{idx}] lib_text пустой. Пропускаем...")
+                continue
+
+            tasks.append((url, lib_text))
+
+        # Сначала скачиваем все статьи (параллельно), потом сравниваем
+        original_texts = fetch_texts([url for url, _ in tasks], parallel)
+
+        # Ошибки загрузки фиксируем сразу, остальное уходит на стадию сравнения
+        compare_tasks = []
+        slots = []
+        for (url, lib_text), original_text in zip(tasks, original_texts):
+            if original_text.startswith("Ошибка"):
+                results.append({
+                    'url': url,
+                    'status': 'error',
+                    'error': original_text
+                })
+                continue
+
+            results.append(None)  # Место результата сравнения, порядок сохраняем
+            slots.append(len(results) - 1)
+            compare_tasks.append((url, original_text, lib_text))
+
+        # Сравнение — чисто вычислительная стадия, распараллеливаем по процессам
+        compare_results = []
+        if compare_tasks:
+            chunksize = max(1, len(compare_tasks) // (4 * parallel))
+            with ProcessPoolExecutor(max_workers=parallel) as executor:
+                compare_results = list(tqdm(
+                    executor.map(_compare_worker, compare_tasks, chunksize=chunksize),
+                    total=len(compare_tasks), desc="Обработка статей"
+                ))
+
+        for slot, result in zip(slots, compare_results):
+            results[slot] = result
+
+        # Каждая строка CSV даёт не больше одного результата
+        assert len(results) <= len(df_input), "результаты задублированы"
+
+        success_pairs = [
+            (orig, lib)
+            for (url, orig, lib), res in zip(compare_tasks, compare_results)
+            if res['status'] == 'success'
+        ]
+
+        # Косинусное сходство считаем одним векторизованным вызовом по всем парам
+        if success_pairs:
+            cosines = compute_cosine_similarities(
+                [orig for orig, _ in success_pairs],
+                [lib for _, lib in success_pairs]
+            )
+            success_iter = iter(cosines)
+            for result in results:
+                if result['status'] == 'success':
+                    result['cosine_similarity'] = round(float(next(success_iter)) * 100, 2)
+
+        # Сохранение результатов
+        save_results(results)
+        generate_comprehensive_report(results)
+        generate_html_report(results, OUTPUT_DIR)
+
+    except Exception as e:
+        print(f"❌ Не удалось обработать файл: {e}")
+        return
+
+if __name__ == "__main__":
+    main()
@@ -83,7 +83,8 @@ HTML_TEMPLATE = """
 
 def generate_html_report(results, output_dir="results"):  # Добавляем параметр output_dir
     """Генерирует HTML отчет с результатами сравнения"""
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    now = datetime.now()
+    timestamp = now.strftime('%Y-%m-%d %H:%M:%S')
     success_count = len([r for r in results if r['status'] == 'success'])
     error_count = len([r for r in results if r['status'] == 'error'])
     
@@ -99,7 +100,7 @@ def generate_html_report(results, output_dir="results"):  # Добавляем 
     # Создаем директорию, если ее нет
     os.makedirs(output_dir, exist_ok=True)
     
-    report_path = os.path.join(output_dir, f'report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.html')
+    report_path = os.path.join(output_dir, f'report_{now.strftime("%Y%m%d_%H%M%S")}.html')
     with open(report_path, 'w', encoding='utf-8') as f:
         f.write(html_content)
     
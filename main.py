@@ -35,7 +35,7 @@ def main():
         print(colored("[*] Starting analysis...", 'green'))
         
         # Вызов основной логики
-        app_main()
+        app_main(parallel=args.parallel)
         
         print(colored("\n[+] Analysis completed successfully!", 'green'))
         print(colored(f"Reports saved to: {args.output}", 'blue'))
